@@ -0,0 +1,42 @@
+import math
+import time
+from mmk import MMk
+
+# Accuracy and speed of the O(1) approximations against the exact O(k)
+# Erlang C computation. Errors are relative errors of Pw, which carry over
+# unchanged to Wq, Lq and the tail probabilities. They are computed from
+# log(Pw) so that a Pw too small for a float still gets a meaningful error.
+
+SERVERS = [100, 1000, 10_000, 100_000, 1_000_000]
+RHOS = [0.5, 0.8, 0.95, 0.99, 0.999]
+
+
+def time_pw(arrival_rate, service_rate, k, method, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        MMk(arrival_rate, service_rate, k, method).probability_all_servers_busy()
+    elapsed = (time.perf_counter() - start) / repeats
+    return MMk(arrival_rate, service_rate, k, method)._log_erlang_c(), elapsed
+
+
+def relative_error(log_approx, log_exact):
+    return abs(math.expm1(log_approx - log_exact))
+
+
+def main():
+    print(f"{'k':>9}{'rho':>7}{'beta':>8}{'exact us':>12}{'normal us':>11}{'normal err':>12}"
+          f"{'H-W us':>9}{'H-W err':>11}")
+    print('-' * 79)
+    for k in SERVERS:
+        for rho in RHOS:
+            lam = rho * k
+            exact, t_exact = time_pw(lam, 1.0, k, 'exact', max(1, 100_000 // k))
+            normal, t_normal = time_pw(lam, 1.0, k, 'normal', 10_000)
+            hw, t_hw = time_pw(lam, 1.0, k, 'halfin-whitt', 10_000)
+            beta = (k - lam) / math.sqrt(lam)
+            print(f"{k:>9,}{rho:>7.3f}{beta:>8.2f}{t_exact * 1e6:>12.1f}{t_normal * 1e6:>11.2f}"
+                  f"{relative_error(normal, exact):>12.1e}{t_hw * 1e6:>9.2f}{relative_error(hw, exact):>11.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,66 @@
 from queue import QueueModel
 import math
 
+# From this many servers on, method='auto' switches from the exact O(k)
+# Erlang C computation to the O(1) 'normal' approximation. Its relative
+# error on Pw (and so on Wq, Lq and the tail probabilities) is below
+# 0.033/sqrt(k): 0.104% at k = 1000, 0.033% at k = 10000.
+#
+# The bound comes from scanning beta = (k - a)/sqrt(a) in steps of 0.001
+# for k from 100 to 3 million. The worst error is always at beta of about
+# 0.41 (rho about 0.96 at k = 100, 0.987 at k = 1000) and is c/sqrt(k)
+# with c rising from 0.0308 (k = 100) to 0.0321 (k = 1000) and 0.0327
+# (k = 3 million), about 0.0327 - 0.019/sqrt(k). test_mmk_asymptotic.py
+# checks the bound on a beta grid.
+#
+# The rule needs k only: for larger beta (lower rho) the error only
+# shrinks. Pw gets tiny, the normal cdf is 1 and the pmf term is exact, so
+# any rho gives an error at most the worst value for its k.
+ASYMPTOTIC_MIN_SERVERS = 1000
+
+METHODS = ('auto', 'exact', 'normal', 'halfin-whitt')
+
+
+def _std_normal_cdf(x):
+    return 0.5 * math.erfc(-x / math.sqrt(2))
+
+
+def erlang_b(k, a):
+    """
+    Exact blocking probability of M/M/k/k with offered load a = λ/μ.
+
+    Uses 1/B = sum_{j=0..k} k!/((k-j)! a^j) and stops once the terms are
+    negligible, so it takes about (k - a) + 9 sqrt(a) steps rather than k.
+    Returns 0.0 when B is below 1e-300.
+    """
+    if k == 0:
+        return 1.0
+    total = 1.0
+    term = 1.0
+    # terms grow while k - j > a, then fall off like a Gaussian
+    rising = max(0, min(k, math.ceil(k - a)))
+    for j in range(rising):
+        term *= (k - j) / a
+        if term > 1e300:
+            return 0.0
+        total += term
+    for j in range(rising, k):
+        term *= (k - j) / a
+        total += term
+        if term < 1e-17 * total:
+            break
+    return 1.0 / total
+
+
+def log_erlang_b_normal(k, a):
+    """
+    O(1) approximation of log(B) for M/M/k/k: the Poisson pmf(k) over a
+    continuity-corrected normal approximation of cdf(k).
+    """
+    log_pmf = k * math.log(a) - a - math.lgamma(k + 1)
+    return log_pmf - math.log(_std_normal_cdf((k + 0.5 - a) / math.sqrt(a)))
+
+
 class MMk(QueueModel):
     """
     M/M/k Queue Model
@@ -8,98 +68,150 @@ class MMk(QueueModel):
     - Infinite capacity
     - Infinite population
     - Multiple server queue
+
+    Everything is derived from the Erlang C probability Pw, which is
+    computed once per model by one of these methods:
+    - 'exact': Erlang B series (erlang_b), at most O(k)
+    - 'normal': Erlang B as Poisson pmf(k) / cdf(k) with the cdf from a
+      continuity-corrected normal approximation, O(1)
+    - 'halfin-whitt': the QED limit Pw = 1 / (1 + β Φ(β) / φ(β)) with
+      β = (k - a) / sqrt(a), O(1). Its error is O(1/sqrt(k)) only while β
+      stays fixed as k grows (rho -> 1). At fixed rho < 1, β grows like
+      sqrt(k) and the error goes to 100% (0.86 at k=1000, rho=0.8)
+    - 'auto': 'exact' below ASYMPTOTIC_MIN_SERVERS servers, 'normal' from there on
     """
-    
-    def __init__(self, arrival_rate, service_rate, num_servers):
+
+    def __init__(self, arrival_rate, service_rate, num_servers, method='auto'):
         """
         Initialize the M/M/k queueing model.
-        
+
         Args:
             arrival_rate (float): Average arrival rate (lambda)
             service_rate (float): Average service rate per server (mu)
             num_servers (int): Number of servers (k)
+            method (str): 'auto', 'exact', 'normal' or 'halfin-whitt'
         """
         # Store num_servers before calling super() to make it available in calculate_utilization
         self.num_servers = num_servers
-        
+
         super().__init__(arrival_rate, service_rate)
-        
+
         self.rho = self.arrival_rate / (self.num_servers * self.service_rate)
-        
+
         # Validate stability condition
-      
+        if self.rho >= 1:
+            raise ValueError("System is unstable: arrival rate must be less than k times the service rate")
+
+        if method not in METHODS:
+            raise ValueError(f"Unknown method: {method}")
+        if method == 'auto':
+            method = 'normal' if num_servers >= ASYMPTOTIC_MIN_SERVERS else 'exact'
+        self.method = method
+        self._log_pw = None
+
     def calculate_utilization(self):
         """Calculate and return the utilization factor (rho)."""
         if hasattr(self, 'num_servers'):
             return self.arrival_rate / (self.num_servers * self.service_rate)
         else:
             return self.arrival_rate / self.service_rate
-    
+
+    def _log_erlang_c(self):
+        """Compute log(Pw) with the selected method. Logs keep tiny Pw from underflowing."""
+        a = self.arrival_rate / self.service_rate
+        k = self.num_servers
+        if a == 0:
+            return float('-inf')
+
+        if self.method == 'halfin-whitt':
+            beta = (k - a) / math.sqrt(a)
+            log_pdf = -beta * beta / 2 - 0.5 * math.log(2 * math.pi)
+            return log_pdf - math.log(math.exp(log_pdf) + beta * _std_normal_cdf(beta))
+
+        if self.method == 'normal':
+            log_b = log_erlang_b_normal(k, a)
+        else:
+            b = erlang_b(k, a)
+            # Once B underflows, k is so far above a that the Poisson
+            # cdf(k) is 1 and B equals pmf(k)
+            log_b = math.log(b) if b > 0 else k * math.log(a) - a - math.lgamma(k + 1)
+        return log_b - math.log(1 - self.rho * (1 - math.exp(log_b)))
+
+    def _log_p0(self):
+        # P0 = Pw (1 - rho) k! / a^k, in logs so large k does not overflow
+        a = self.arrival_rate / self.service_rate
+        k = self.num_servers
+        if self._log_pw is None:
+            self._log_pw = self._log_erlang_c()
+        return self._log_pw + math.log(1 - self.rho) + math.lgamma(k + 1) - k * math.log(a)
+
     def probability_idle(self):
         """Calculate and return the probability that the system is idle (P0)."""
-        sum_terms = sum((self.arrival_rate/self.service_rate)**n / math.factorial(n) for n in range(self.num_servers))
-        last_term = (self.arrival_rate/self.service_rate)**self.num_servers / (math.factorial(self.num_servers) * (1 - self.rho))
-        return 1.0 / (sum_terms + last_term)
-    
+        if self.arrival_rate == 0:
+            return 1.0
+        return math.exp(self._log_p0())
+
     def probability_n_customers(self, n):
         """
         Calculate and return the probability of having n customers in the system.
-        
+
         Args:
             n (int): Number of customers
         """
         if n < 0:
             return 0
-            
+        if self.arrival_rate == 0:
+            return 1.0 if n == 0 else 0.0
+
         a = self.arrival_rate / self.service_rate
         k = self.num_servers
-        p0 = self.probability_idle()
-        
+        log_p0 = self._log_p0()
+
         if n <= k:
-            return (a**n) / math.factorial(n) * p0
+            return math.exp(log_p0 + n * math.log(a) - math.lgamma(n + 1))
         else:
-            return (a**n) / (math.factorial(k) * (k**(n-k))) * p0
-    
+            return math.exp(log_p0 + n * math.log(a) - math.lgamma(k + 1) - (n - k) * math.log(k))
+
     def average_customers_in_queue(self):
         """Calculate and return the average number of customers in the queue (Lq)."""
-        lamda = self.arrival_rate
-        mu = self.service_rate
-        k = self.num_servers
-        p0 = self.probability_idle()
-        
-        return ((lamda/mu)**k * lamda * mu) / (math.factorial(k-1) * (k*mu - lamda)**2) * p0
-    
+        return self.arrival_rate * self.average_time_in_queue()
+
     def average_customers_in_system(self):
         """Calculate and return the average number of customers in the system (L)."""
-        lamda = self.arrival_rate
-        mu = self.service_rate
-        k = self.num_servers
-        p0 = self.probability_idle()
-        
-        return ((lamda/mu)**k * lamda * mu) / (math.factorial(k-1) * (k*mu - lamda)**2) * p0 + lamda/mu
-    
+        return self.average_customers_in_queue() + self.arrival_rate / self.service_rate
+
     def average_time_in_queue(self):
         """Calculate and return the average time spent in the queue (Wq)."""
-        lamda = self.arrival_rate
-        mu = self.service_rate
         k = self.num_servers
-        p0 = self.probability_idle()
-        
-        return ((lamda/mu)**k * mu) / (math.factorial(k-1) * (k*mu - lamda)**2) * p0
-    
+        return self.probability_all_servers_busy() / (k * self.service_rate - self.arrival_rate)
+
     def average_time_in_system(self):
         """Calculate and return the average time spent in the system (W)."""
-        lamda = self.arrival_rate
-        mu = self.service_rate
-        k = self.num_servers
-        p0 = self.probability_idle()
-        
-        return ((lamda/mu)**k * mu) / (math.factorial(k-1) * (k*mu - lamda)**2) * p0 + 1/mu
-    
+        return self.average_time_in_queue() + 1 / self.service_rate
+
     def probability_all_servers_busy(self):
         """Calculate and return the probability that all servers are busy (Pw)."""
+        if self._log_pw is None:
+            self._log_pw = self._log_erlang_c()
+        return math.exp(self._log_pw)
+
+    def probability_wait_exceeds(self, t):
+        """
+        Calculate and return the probability that a customer waits longer than t.
+
+        Args:
+            t (float): Waiting time
+        """
         k = self.num_servers
-        p0 = self.probability_idle()
-        
-        return (1/math.factorial(k)) * (self.arrival_rate/self.service_rate)**k * (k*self.service_rate/(k*self.service_rate - self.arrival_rate)) * p0
-        
\ No newline at end of file
+        return self.probability_all_servers_busy() * math.exp(-(k * self.service_rate - self.arrival_rate) * t)
+
+    def probability_queue_at_least(self, j):
+        """
+        Calculate and return the probability of at least j customers waiting.
+
+        Args:
+            j (int): Number of customers in the queue
+        """
+        if j <= 0:
+            return 1.0
+        return self.probability_all_servers_busy() * self.rho ** j
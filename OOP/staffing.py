@@ -0,0 +1,125 @@
+import math
+from array import array
+from mmk import ASYMPTOTIC_MIN_SERVERS, erlang_b, log_erlang_b_normal
+
+
+def _erlang_b(k, a):
+    # Same switch as MMk(method='auto'): exact below ASYMPTOTIC_MIN_SERVERS,
+    # the O(1) normal approximation from there on
+    if k < ASYMPTOTIC_MIN_SERVERS:
+        return erlang_b(k, a)
+    return math.exp(log_erlang_b_normal(k, a))
+
+
+def erlang_c(k, a):
+    """Probability an arrival has to wait in M/M/k (Pw), for k > a."""
+    return _c_from_b(k, a, _erlang_b(k, a))
+
+
+def _c_from_b(k, a, b):
+    rho = a / k
+    return b / (1 - rho * (1 - b))
+
+
+def _meets_sla(k, lam, mu, c, max_wq, max_pw, service_level):
+    if max_pw is not None and c > max_pw:
+        return False
+    drain = k * mu - lam
+    if max_wq is not None and c / drain > max_wq:
+        return False
+    if service_level is not None:
+        t, fraction = service_level
+        # P(Wq > t) = Pw * exp(-(kμ - λ) t)
+        if c * math.exp(-drain * t) > 1 - fraction:
+            return False
+    return True
+
+
+def plan_staffing(arrival_rates, service_rate, max_wq=None, max_pw=None,
+                  service_level=None, server_cost=1.0, min_servers=0):
+    """
+    Minimum number of M/M/k servers for every interval of a day (or year).
+
+    Args:
+        arrival_rates (sequence): λ of each interval
+        service_rate (float or sequence): μ per server, one value or one per interval
+        max_wq (float): Upper bound on the mean wait in queue (Wq)
+        max_pw (float): Upper bound on the probability of waiting (Pw)
+        service_level (tuple): (t, fraction), at least fraction of customers wait <= t
+        server_cost (float): Cost of one server for one interval
+        min_servers (int): Staffing floor for every interval
+
+    Returns a dict of columns 'k', 'Wq', 'Pw', 'cost' (one entry per
+    interval) and 'total_cost'.
+
+    Each search starts from square-root staffing k = a + β·sqrt(a), with β
+    carried over from the previous interval, and walks k up or down using
+    the O(1) Erlang B recursion. The starting Erlang B value is exact below
+    ASYMPTOTIC_MIN_SERVERS servers and the O(1) normal approximation above,
+    the same switch (and error bound) as MMk(method='auto').
+    """
+    if max_wq is None and max_pw is None and service_level is None:
+        raise ValueError("At least one of max_wq, max_pw or service_level is required")
+
+    n = len(arrival_rates)
+    if isinstance(service_rate, (int, float)):
+        service_rates = [service_rate] * n
+    else:
+        service_rates = service_rate
+        if len(service_rates) != n:
+            raise ValueError("service_rate must be a number or have one value per interval")
+
+    staff = array('l')
+    waits = array('d')
+    pws = array('d')
+    costs = array('d')
+    beta = 1.0
+    cache = {}
+
+    for lam, mu in zip(arrival_rates, service_rates):
+        if (lam, mu) in cache:
+            k, wq, c = cache[lam, mu]
+        elif lam <= 0:
+            k, wq, c = 0, 0.0, 0.0
+        else:
+            a = lam / mu
+            k_min = math.floor(a) + 1  # smallest stable k
+            k = max(k_min, math.ceil(a + beta * math.sqrt(a)))
+            b = _erlang_b(k, a)
+            c = _c_from_b(k, a, b)
+            if _meets_sla(k, lam, mu, c, max_wq, max_pw, service_level):
+                # walk down while k - 1 still meets the SLA
+                while k > k_min:
+                    if b == 0:
+                        # B underflowed: no recursion back from 0
+                        b_down = _erlang_b(k - 1, a)
+                    else:
+                        b_down = k / (a * (1 / b - 1)) if b < 1 else 1.0
+                    c_down = _c_from_b(k - 1, a, b_down)
+                    if not _meets_sla(k - 1, lam, mu, c_down, max_wq, max_pw, service_level):
+                        break
+                    k, b, c = k - 1, b_down, c_down
+            else:
+                while True:
+                    b = a * b / (k + 1 + a * b)
+                    k += 1
+                    c = _c_from_b(k, a, b)
+                    if _meets_sla(k, lam, mu, c, max_wq, max_pw, service_level):
+                        break
+            beta = (k - a) / math.sqrt(a)
+            wq = c / (k * mu - lam)
+            cache[lam, mu] = (k, wq, c)
+
+        if k < min_servers:
+            # more servers than needed: recompute the metrics for the floor
+            k = min_servers
+            a = lam / mu
+            c = erlang_c(k, a) if lam > 0 else 0.0
+            wq = c / (k * mu - lam) if lam > 0 else 0.0
+
+        staff.append(k)
+        waits.append(wq)
+        pws.append(c)
+        costs.append(k * server_cost)
+
+    return {'k': staff, 'Wq': waits, 'Pw': pws, 'cost': costs, 'total_cost': sum(costs)}
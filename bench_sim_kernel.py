@@ -0,0 +1,96 @@
+import math
+import time
+
+from bonus_mm1 import Streams, mmk_simulation, nhpp_simulation
+from sim_kernel import HAVE_NUMBA
+
+# Customers/sec of mmk_simulation end to end (drawing the variates, the
+# event loop and the totals) for each backend at several loads, then of
+# nhpp_simulation on a daily rate table against mmk_simulation with as many
+# customers.
+
+NUM_CUSTOMERS = 200_000
+MU = 1.0
+CONFIGS = [
+    ('M/M/1 (Lindley)', 1, None),
+    ('M/M/10', 10, None),
+    ('M/M/10/20', 10, 20),
+]
+RHOS = [0.5, 0.8, 0.9, 0.95]
+NHPP_DAYS = 20
+NHPP_MU = 10.0
+NHPP_LAMBDAS = [4, 40, 400]
+
+
+def customers_per_sec(lambda_, k, capacity, backend):
+    start = time.perf_counter()
+    result = mmk_simulation(lambda_, MU, k, NUM_CUSTOMERS, Streams(1), capacity, backend=backend)
+    elapsed = time.perf_counter() - start
+    return NUM_CUSTOMERS / elapsed, result
+
+
+def best_of(run, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def nhpp_vs_stationary(backends):
+    # 15-minute pieces with a daily swing of ±30% around lam, 1-hour buckets
+    print()
+    header = f"{'mean λ':<8}{'backend':<9}{'customers':>11}{'nhpp cust/s':>14}{'stationary':>14}{'ratio':>8}"
+    print(header)
+    print('-' * len(header))
+    horizon = 24.0 * NHPP_DAYS
+    for lam in NHPP_LAMBDAS:
+        table = [(0.25 * i, lam * (1 + 0.3 * math.sin(2 * math.pi * i / 96)))
+                 for i in range(96 * NHPP_DAYS)]
+        k = int(lam / NHPP_MU * 1.3) + 1
+        for backend in backends:
+            n = nhpp_simulation(table, NHPP_MU, k, horizon, 1.0, Streams(1),
+                                backend=backend)['num_customers']
+            nhpp = best_of(lambda: nhpp_simulation(table, NHPP_MU, k, horizon, 1.0, Streams(1),
+                                                   backend=backend))
+            stationary = best_of(lambda: mmk_simulation(lam, NHPP_MU, k, n, Streams(1),
+                                                        backend=backend))
+            print(f"{lam:<8}{backend:<9}{n:>11,}{n / nhpp:>14,.0f}{n / stationary:>14,.0f}"
+                  f"{nhpp / stationary:>7.2f}x")
+
+
+def main():
+    backends = ['python', 'numba'] if HAVE_NUMBA else ['python']
+    if not HAVE_NUMBA:
+        print("numba not installed, benchmarking the Python backend only")
+
+    if HAVE_NUMBA:
+        # compile outside the timed runs
+        mmk_simulation(0.5, MU, 1, 10, Streams(0), backend='numba')
+        mmk_simulation(0.5, MU, 2, 10, Streams(0), 4, backend='numba')
+
+    header = f"{'model':<18}{'rho':>6}" + ''.join(f"{b + ' cust/s':>16}" for b in backends)
+    if HAVE_NUMBA:
+        header += f"{'speedup':>10}{'identical':>11}"
+    print(header)
+    print('-' * len(header))
+
+    for name, k, capacity in CONFIGS:
+        for rho in RHOS:
+            rates = []
+            results = []
+            for backend in backends:
+                rate, result = customers_per_sec(rho * k * MU, k, capacity, backend)
+                rates.append(rate)
+                results.append(result)
+            line = f"{name:<18}{rho:>6.2f}" + ''.join(f"{r:>16,.0f}" for r in rates)
+            if HAVE_NUMBA:
+                line += f"{rates[1] / rates[0]:>9.1f}x{str(results[0] == results[1]):>11}"
+            print(line)
+
+    nhpp_vs_stationary(backends)
+
+
+if __name__ == "__main__":
+    main()
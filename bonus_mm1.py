@@ -1,9 +1,64 @@
 #bonus (Phase II)
+import math
 import random
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+
+from sim_kernel import (bucket_sums, draw_exponentials, interarrival_times, piecewise_arrivals,
+                        simulate_mmk, simulate_waits)
 
 def exponential(rate):
     return random.expovariate(rate)
 
+class Streams:
+    """
+    Separate random number streams for arrivals and services.
+
+    Two runs built from the same seed see exactly the same interarrival and
+    service times (common random numbers). With antithetic=True every uniform
+    u is replaced by 1 - u, which gives the antithetic partner of a run.
+    """
+
+    def __init__(self, seed, antithetic=False):
+        self.seed = seed
+        self.antithetic = antithetic
+        self.arrivals = random.Random(f"{seed}-arrivals")
+        self.services = random.Random(f"{seed}-services")
+        self.thinning = random.Random(f"{seed}-thinning")
+
+    def _exponential(self, rng, rate):
+        u = rng.random()
+        while u == 0.0:
+            u = rng.random()
+        # u is in (0, 1) so both log(u) and log(1 - u) are finite
+        if self.antithetic:
+            return -math.log(u) / rate
+        return -math.log(1.0 - u) / rate
+
+    def interarrival(self, rate):
+        return self._exponential(self.arrivals, rate)
+
+    def service(self, rate):
+        return self._exponential(self.services, rate)
+
+    def acceptance(self):
+        # uniform used to accept or reject a thinning candidate
+        u = self.thinning.random()
+        return 1.0 - u if self.antithetic else u
+
+    # Block versions of the draws above: the same values as n single calls,
+    # one list comprehension per block instead of a method call per variate.
+
+    def interarrivals(self, rate, n):
+        return draw_exponentials(self.arrivals, rate, n, self.antithetic, 'python')
+
+    def acceptances(self, n):
+        rand = self.thinning.random
+        if self.antithetic:
+            return [1.0 - rand() for _ in range(n)]
+        return [rand() for _ in range(n)]
+
 def mm1_simulation(lambda_, mu, num_customers):
     current_time = 0
     queue = []
@@ -89,9 +144,129 @@ def mm1_simulation(lambda_, mu, num_customers):
     }
 
 
-random.seed(8)  # PRN 
-results = mm1_simulation(lambda_=5, mu=7.5, num_customers=9999) #elexample ely felktab
+def mmk_simulation(lambda_, mu, k, num_customers, streams=None, capacity=None, warmup=0,
+                   backend='auto'):
+    # FCFS M/M/k (or M/M/k/K when capacity is given) simulation.
+    # Every customer draws its interarrival and service time from its own
+    # stream, even when blocked, so runs sharing a seed stay synchronised.
+    # The draws, the event loop and the totals run in sim_kernel, compiled
+    # when numba is installed.
+    if warmup >= num_customers:
+        raise ValueError("num_customers must be larger than warmup")
+    if streams is None:
+        streams = Streams(random.getrandbits(64))
+
+    totals = simulate_mmk(streams.arrivals, streams.services, lambda_, mu, num_customers,
+                          k, capacity, warmup, streams.antithetic, backend)
+
+    # A very short run may serve nobody or span no time: report NaN then
+    nan = float('nan')
+    num_served = totals['served']
+    num_arrived = totals['arrived']
+    elapsed = totals['end'] - totals['start']
+    W = totals['system'] / num_served if num_served else nan
+    Wq = totals['wait'] / num_served if num_served else nan
+    lambda_eff = num_served / elapsed if elapsed > 0 else nan
+    return {
+        'W': W,
+        'Wq': Wq,
+        'L': lambda_eff * W,     # Little's Law
+        'Lq': lambda_eff * Wq,
+        'ρ': totals['busy'] / (k * elapsed) if elapsed > 0 else nan,
+        'P_block': totals['blocked'] / num_arrived,
+        'λ_eff': lambda_eff,
+        # sample means with exactly known expectations 1/mu and 1/lambda_,
+        # free control variates for the estimates above
+        'mean_service': totals['service'] / num_arrived,
+        'mean_interarrival': elapsed / (num_arrived - 1) if num_arrived > 1 else nan,
+    }
+
+def nhpp_arrivals(rate, horizon, streams, rate_max=None, max_block=65536, backend='auto'):
+    # Arrival times of a nonhomogeneous Poisson process on [0, horizon).
+    # rate is either a piecewise-constant table [(start_time, λ), ...]
+    # sorted by start_time, or a function of time bounded by rate_max.
+    # A table goes through piecewise_arrivals in sim_kernel: unit-rate
+    # points mapped back through the cumulative rate, one block for all
+    # pieces, so a short piece costs no more than a long one. A function is
+    # thinned: candidates from a homogeneous process at rate_max are
+    # generated and accepted a block at a time. A block is sized to the
+    # expected number of candidates left plus a few standard deviations, so
+    # it almost always takes one block and draws little more than it uses.
+    # rate(t) is still evaluated once per candidate in Python, and a rate
+    # above rate_max raises ValueError.
+    if not callable(rate):
+        pieces = []
+        for i, (start, lam) in enumerate(rate):
+            end = min(rate[i + 1][0] if i + 1 < len(rate) else horizon, horizon)
+            if lam > 0 and start < end:
+                pieces.append((start, lam, end))
+        starts, rates, ends = zip(*pieces) if pieces else ((), (), ())
+
+        def unit_gaps(n, backend):
+            return draw_exponentials(streams.arrivals, 1.0, n, streams.antithetic, backend)
+
+        arrivals = piecewise_arrivals(unit_gaps, starts, rates, ends, max_block, backend)
+        # rounding in the last piece can land on the horizon itself
+        del arrivals[bisect_left(arrivals, horizon):]
+        return arrivals
+
+    if rate_max is None:
+        raise ValueError("rate_max is required when rate is a function")
+    arrivals = array('d')
+    t = 0.0
+    while t < horizon:
+        expected = rate_max * (horizon - t)
+        block = min(int(expected + 3.0 * math.sqrt(expected)) + 4, max_block)
+        gaps = streams.interarrivals(rate_max, block)
+        gaps[0] += t
+        candidates = list(accumulate(gaps))
+        t = candidates[-1]
+        if t >= horizon:
+            del candidates[bisect_left(candidates, horizon):]
+        for x, u in zip(candidates, streams.acceptances(len(candidates))):
+            lam = rate(x)
+            if lam > rate_max:
+                raise ValueError(f"rate({x}) = {lam} exceeds rate_max = {rate_max}")
+            if u * rate_max <= lam:
+                arrivals.append(x)
+    return arrivals
+
+
+def nhpp_simulation(rate, mu, k, horizon, bucket, streams=None, capacity=None,
+                    rate_max=None, backend='auto'):
+    # M/M/k(/K) with time-varying arrivals (see nhpp_arrivals for rate).
+    # Reports per time bucket: observed arrival rate, time-average number
+    # in system L(t), mean wait of the customers arriving in the bucket
+    # Wq(t) (NaN if none), utilisation ρ(t) and the blocked fraction.
+    if streams is None:
+        streams = Streams(random.getrandbits(64))
+
+    arrivals = nhpp_arrivals(rate, horizon, streams, rate_max, backend=backend)
+    num_customers = len(arrivals)
+    interarrivals = interarrival_times(arrivals, backend)
+    services = draw_exponentials(streams.services, mu, num_customers, streams.antithetic, backend)
+    waits = simulate_waits(interarrivals, services, k, capacity, backend)
+    sums = bucket_sums(arrivals, waits, services, bucket, horizon, backend)
+
+    nan = float('nan')
+    n_buckets = len(sums['arrived'])
+    widths = [min(bucket, horizon - b * bucket) for b in range(n_buckets)]
+    arrived, served, blocked = sums['arrived'], sums['served'], sums['blocked']
+    return {
+        't': array('d', (b * bucket for b in range(n_buckets))),
+        'λ': array('d', (arrived[b] / widths[b] for b in range(n_buckets))),
+        'L': array('d', (sums['in_system'][b] / widths[b] for b in range(n_buckets))),
+        'Wq': array('d', (sums['wait'][b] / served[b] if served[b] else nan for b in range(n_buckets))),
+        'ρ': array('d', (sums['busy'][b] / (k * widths[b]) for b in range(n_buckets))),
+        'P_block': array('d', (blocked[b] / arrived[b] if arrived[b] else nan for b in range(n_buckets))),
+        'num_customers': num_customers,
+    }
+
+
+if __name__ == "__main__":
+    random.seed(8)  # PRN 
+    results = mm1_simulation(lambda_=5, mu=7.5, num_customers=9999) #elexample ely felktab
 
-#printing el results 
-for k, v in results.items():
-    print(f"{k}: {v:.3f}")
+    #printing el results 
+    for k, v in results.items():
+        print(f"{k}: {v:.3f}")
@@ -0,0 +1,24 @@
+import importlib
+import os
+import sys
+
+OOP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'OOP')
+
+
+def import_oop(name):
+    """
+    Import a module of the OOP package the way its scripts run, with OOP/
+    first on sys.path, since its classes use flat imports (from queue import
+    QueueModel). The standard library queue module is put back afterwards,
+    so tests that import it later (or libraries such as numba) still get it.
+    """
+    saved = sys.modules.pop('queue', None)
+    sys.path.insert(0, OOP_DIR)
+    try:
+        return importlib.import_module(name)
+    finally:
+        sys.path.remove(OOP_DIR)
+        if saved is not None:
+            sys.modules['queue'] = saved
+        else:
+            sys.modules.pop('queue', None)
@@ -0,0 +1,221 @@
+import json
+import math
+import os
+import struct
+import sys
+from array import array
+
+# Fixed schema shared by every model. Parameters first, then the metrics.
+# Anything a model does not define stays NaN. Both ways of filling the
+# table write the same quantity to a column:
+# - arrival_rate: the λ in the model's formulas. For M/M/1/m that is the
+#   rate per idle source (queues.mm1m's lambda_rate, MM1m.arrival_rate).
+# - rho: λ/(kμ), except M/M/1/m where it is λ_eff/μ (server utilization).
+# - Pw: probability that all servers are busy (0 for M/M/∞).
+PARAMETERS = ('arrival_rate', 'service_rate', 'servers', 'capacity', 'population')
+METRICS = ('rho', 'a', 'P0', 'P1', 'P2', 'P3', 'P4', 'PK',
+           'L', 'Lq', 'W', 'Wq', 'lambda_eff', 'Pw')
+COLUMNS = PARAMETERS + METRICS
+
+# Keys used by the dicts in queues.py that differ from the column names
+RESULT_KEYS = {'ρ': 'rho', 'λ_eff': 'lambda_eff'}
+
+NAN = float('nan')
+
+
+class MetricsTable:
+    """
+    Columnar store for queueing results.
+
+    Every column is a compact array of float64 with the same length, so a
+    million rows cost about 8 bytes per cell instead of a dict per row.
+    Missing metrics are stored as NaN.
+    """
+
+    __slots__ = ('_columns',)
+
+    def __init__(self):
+        self._columns = {name: array('d') for name in COLUMNS}
+
+    def __len__(self):
+        return len(self._columns['rho'])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def column(self, name):
+        """
+        Return a column as a memoryview of the table's own buffer (no copy).
+        Writes through the view change the table.
+
+        Args:
+            name (str): Column name from COLUMNS
+        """
+        if name not in self._columns:
+            raise ValueError(f"Unknown column: {name}")
+        return memoryview(self._columns[name])
+
+    def row(self, i):
+        """Return row i as a dict keyed by column name."""
+        return {name: col[i] for name, col in self._columns.items()}
+
+    def append(self, **values):
+        """Append one row. Columns that are not given are filled with NaN."""
+        unknown = set(values) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+        for name, col in self._columns.items():
+            value = values.get(name)
+            col.append(NAN if value is None else float(value))
+
+    def append_result(self, result, **params):
+        """
+        Append a result dict returned by one of the functions in queues.py.
+
+        Args:
+            result (dict): Metrics keyed like {'ρ': ..., 'P0': ..., 'λ_eff': ...}
+            **params: Input parameters (arrival_rate, service_rate, servers, ...)
+        """
+        values = {RESULT_KEYS.get(key, key): value for key, value in result.items()}
+        values.update(params)
+        self.append(**values)
+
+    def append_model(self, model):
+        """
+        Append the metrics of a QueueModel instance from the OOP package.
+
+        Args:
+            model (QueueModel): Any of MM1, MM1K, MM1m, MMk, MMInf
+        """
+        capacity = getattr(model, 'capacity', None)
+        population = getattr(model, 'population_size', None)
+        lambda_eff = None
+        if hasattr(model, 'effective_arrival_rate'):
+            lambda_eff = model.effective_arrival_rate()
+        rho = model.rho
+        if population is not None:
+            rho = lambda_eff / model.service_rate
+        self.append(
+            arrival_rate=model.arrival_rate,
+            service_rate=model.service_rate,
+            servers=getattr(model, 'num_servers', None),
+            capacity=capacity,
+            population=population,
+            rho=rho,
+            a=getattr(model, 'a', None),
+            P0=model.probability_idle(),
+            P1=model.probability_n_customers(1),
+            P2=model.probability_n_customers(2),
+            P3=model.probability_n_customers(3),
+            P4=model.probability_n_customers(4),
+            PK=model.probability_n_customers(capacity) if capacity is not None else None,
+            L=model.average_customers_in_system(),
+            Lq=model.average_customers_in_queue(),
+            W=model.average_time_in_system(),
+            Wq=model.average_time_in_queue(),
+            lambda_eff=lambda_eff,
+            Pw=model.probability_all_servers_busy(),
+        )
+
+    def extend_models(self, models):
+        """Append every model in an iterable of QueueModel instances."""
+        for model in models:
+            self.append_model(model)
+
+    def extend_results(self, results, params=None):
+        """
+        Append many result dicts from queues.py.
+
+        Args:
+            results (iterable): Result dicts
+            params (iterable): Optional dicts of input parameters, one per result
+        """
+        if params is None:
+            for result in results:
+                self.append_result(result)
+        else:
+            for result, p in zip(results, params):
+                self.append_result(result, **p)
+
+    def to_numpy(self):
+        """
+        Return the table as a NumPy structured array (requires numpy).
+
+        The data is copied once into row-major layout. Use save_npy() for
+        zero-copy export of the columns.
+        """
+        import numpy as np
+        out = np.empty(len(self), dtype=[(name, '<f8') for name in COLUMNS])
+        for name, col in self._columns.items():
+            out[name] = np.frombuffer(col, dtype=np.float64)
+        return out
+
+    def save_npy(self, directory):
+        """
+        Write every column to <directory>/<column>.npy.
+
+        The column buffers are written straight to disk without copying. The
+        files are standard .npy files, so numpy.load(path, mmap_mode='r')
+        memory-maps them.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name, col in self._columns.items():
+            with open(os.path.join(directory, name + '.npy'), 'wb') as f:
+                f.write(_npy_header(len(col)))
+                if sys.byteorder == 'little':
+                    col.tofile(f)
+                else:
+                    swapped = array('d', col)
+                    swapped.byteswap()
+                    swapped.tofile(f)
+
+    @classmethod
+    def load_npy(cls, directory):
+        """Read a table written by save_npy() without needing numpy."""
+        table = cls()
+        for name, col in table._columns.items():
+            with open(os.path.join(directory, name + '.npy'), 'rb') as f:
+                length = _read_npy_header(f)
+                col.fromfile(f, length)
+            if sys.byteorder != 'little':
+                col.byteswap()
+        return table
+
+    def write_csv(self, f):
+        """Stream the table to an open text file as CSV, one row at a time."""
+        f.write(','.join(COLUMNS) + '\n')
+        columns = [self._columns[name] for name in COLUMNS]
+        for i in range(len(self)):
+            f.write(','.join(repr(col[i]) for col in columns) + '\n')
+
+    def write_jsonl(self, f):
+        """Stream the table to an open text file as JSON lines. NaN becomes null."""
+        columns = [self._columns[name] for name in COLUMNS]
+        for i in range(len(self)):
+            record = {}
+            for name, col in zip(COLUMNS, columns):
+                value = col[i]
+                record[name] = None if math.isnan(value) else value
+            f.write(json.dumps(record) + '\n')
+
+
+def _npy_header(length):
+    """Build a version 1.0 .npy header for a 1-D little-endian float64 array."""
+    header = "{'descr': '<f8', 'fortran_order': False, 'shape': (%d,), }" % length
+    # magic (6) + version (2) + header length (2) + header, padded to 64 bytes
+    padding = 64 - (10 + len(header) + 1) % 64
+    header = header + ' ' * padding + '\n'
+    return b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1')
+
+
+def _read_npy_header(f):
+    """Parse a header written by _npy_header() and return the array length."""
+    if f.read(8) != b'\x93NUMPY\x01\x00':
+        raise ValueError("Not a version 1.0 .npy file")
+    header_len, = struct.unpack('<H', f.read(2))
+    header = f.read(header_len).decode('latin1')
+    if "'<f8'" not in header:
+        raise ValueError("Expected a float64 .npy file")
+    shape = header[header.index('(') + 1:header.index(')')]
+    return int(shape.rstrip(','))
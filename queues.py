@@ -1,4 +1,5 @@
 import math
+from metrics_table import MetricsTable
 
 def mm1(lambda_rate, mu_rate):
     rho = lambda_rate / mu_rate
@@ -29,8 +30,8 @@ def mmk(lambda_rate, mu_rate, k):
     L = Lq + a
     Wq = Lq / lambda_rate
     W = Wq + 1 / mu_rate
-    # Probability all servers are busy
-    Pw = sum(P0 * (a**n) / (math.factorial(k) * k**(n-k)) for n in range(k, k+1))
+    # Probability all servers are busy (Erlang C): sum of Pn over n >= k
+    Pw = P0 * a**k / (math.factorial(k) * (1 - rho))
     return {'ρ': rho, 'P0': P0, 'P1': Pn[0], 'P2': Pn[1], 'P3': Pn[2], 'P4': Pn[3],
             'L': L, 'Lq': Lq, 'W': W, 'Wq': Wq, 'Pw': Pw}
 
@@ -77,6 +78,35 @@ def mminf(lambda_rate, mu_rate, Nmax):
     return {'ρ': rho, 'a': a, 'P0': P0, 'P1': Pn[1], 'P2': Pn[2], 'P3': Pn[3], 'P4': Pn[4],
             'L': a, 'Lq': 0.0, 'W': 1/mu_rate, 'Wq': 0.0, 'Pw': Pw}
 
+# Column names for the positional arguments of each model function
+_PARAM_COLUMNS = {
+    mm1: ('arrival_rate', 'service_rate'),
+    mmk: ('arrival_rate', 'service_rate', 'servers'),
+    mm1k: ('arrival_rate', 'service_rate', 'capacity'),
+    mm1m: ('arrival_rate', 'service_rate', 'population'),
+    mminf: ('arrival_rate', 'service_rate', None),
+}
+
+def tabulate(model, params, table=None):
+    # Run one model over many parameter tuples and collect everything in a
+    # MetricsTable instead of keeping a dict per call
+    # e.g. tabulate(mmk, [(5, 8, k) for k in range(1, 10)])
+    if table is None:
+        table = MetricsTable()
+    names = _PARAM_COLUMNS[model]
+    for args in params:
+        res = model(*args)
+        values = {name: value for name, value in zip(names, args) if name}
+        # fill the columns the way MetricsTable.append_model does (see the
+        # schema in metrics_table.py) without changing what the functions return
+        if model is mm1k:
+            values['lambda_eff'] = args[0] * (1 - res['PK'])
+        elif model is mminf:
+            values['lambda_eff'] = args[0]
+            values['Pw'] = 0.0  # infinitely many servers are never all busy
+        table.append_result(res, **values)
+    return table
+
 def print_dict(d):
     for k, v in d.items():
         if isinstance(v, list):
@@ -0,0 +1,533 @@
+import heapq
+import math
+from array import array
+from itertools import chain
+from operator import sub
+
+# Optional compiled backend. Without numba everything runs in pure Python.
+try:
+    import numba
+    import numpy as np
+except ImportError:
+    numba = None
+    np = None
+
+HAVE_NUMBA = numba is not None
+
+# simulate_mmk feeds customers through in chunks of this many, so a run of
+# any length needs a fixed amount of memory.
+CHUNK = 65536
+
+# Names of the run totals kept by _summarize, in order.
+TOTALS = ('end', 'start', 'wait', 'system', 'busy', 'service', 'arrived', 'served', 'blocked')
+
+
+# _lindley and _summarize run as is in Python and are also what numba
+# compiles. For k > 1 the Python reference (_mmk_heap) keeps its server
+# calendar in a heap, O(log k) per customer, while the kernel numba compiles
+# (_mmk) scans an array, which is cheap once compiled. Both do the same
+# float operations in the same order (only add, subtract and compare, no
+# fastmath, nothing to fuse into FMA), so the backends give bit-for-bit
+# identical waits. test_sim_kernel.py checks the scan kernel against the
+# reference in pure Python and, when numba is installed, the compiled
+# kernels as well.
+#
+# Every kernel keeps its state (clock, server calendar, customers in the
+# system) in buffers owned by the caller, so a run can be fed to it a chunk
+# of customers at a time.
+
+def _lindley(interarrivals, services, waits, state):
+    # Single server FCFS: W[i] = max(0, W[i-1] + S[i-1] - A[i]).
+    # state holds the wait and service time of the previous customer
+    # (zeros before the first one).
+    w = state[0]
+    s = state[1]
+    i = 0
+    for interarrival, service in zip(interarrivals, services):
+        w = w + s - interarrival
+        if w < 0.0:
+            w = 0.0
+        waits[i] = w
+        s = service
+        i += 1
+    state[0] = w
+    state[1] = s
+
+
+def _mmk_heap(interarrivals, services, capacity, waits, server_free, departures, state):
+    # Python reference for FCFS M/M/k/K, same conventions as _mmk.
+    # server_free is a heap of the k times the servers become free and
+    # departures a heap of the departure times of customers in the system.
+    heappop = heapq.heappop
+    heappush = heapq.heappush
+    heapreplace = heapq.heapreplace
+    t = state[0]
+    for i in range(len(interarrivals)):
+        t += interarrivals[i]
+        if capacity > 0:
+            while departures and departures[0] <= t:
+                heappop(departures)
+            if len(departures) >= capacity:
+                waits[i] = -1.0
+                continue
+        free = server_free[0]
+        start = free if free > t else t
+        departure = start + services[i]
+        heapreplace(server_free, departure)
+        if capacity > 0:
+            heappush(departures, departure)
+        waits[i] = start - t
+    state[0] = t
+
+
+def _mmk(interarrivals, services, k, capacity, waits, server_free, in_system, state):
+    # FCFS M/M/k/K. capacity <= 0 means no limit. Blocked customers get a
+    # wait of -1.0. server_free (length k) holds the time each server
+    # becomes free, in_system (length capacity) the departure times of the
+    # customers in the system and state the clock and their number.
+    t = state[0]
+    n_in = int(state[1])
+    for i in range(len(interarrivals)):
+        t += interarrivals[i]
+        if capacity > 0:
+            # drop customers that left before this arrival
+            m = 0
+            for j in range(n_in):
+                if in_system[j] > t:
+                    in_system[m] = in_system[j]
+                    m += 1
+            n_in = m
+            if n_in >= capacity:
+                waits[i] = -1.0
+                continue
+        # the customer takes the server that frees up first
+        s = 0
+        for j in range(1, k):
+            if server_free[j] < server_free[s]:
+                s = j
+        start = server_free[s] if server_free[s] > t else t
+        departure = start + services[i]
+        server_free[s] = departure
+        if capacity > 0:
+            in_system[n_in] = departure
+            n_in += 1
+        waits[i] = start - t
+    state[0] = t
+    state[1] = n_in
+
+
+def _summarize(interarrivals, services, waits, warmup, totals):
+    # Add one chunk of customers to the run totals (see TOTALS). warmup is
+    # the index within this chunk of the first measured customer; it may be
+    # negative (all measured) or past the end (none measured).
+    t = totals[0]
+    start = totals[1]
+    total_wait = totals[2]
+    total_system = totals[3]
+    total_busy = totals[4]
+    total_service = totals[5]
+    arrived = totals[6]
+    served = totals[7]
+    blocked = totals[8]
+    i = 0
+    for interarrival, service, wait in zip(interarrivals, services, waits):
+        t += interarrival
+        if i >= warmup:
+            if i == warmup:
+                start = t
+            total_service += service
+            arrived += 1
+            if wait < 0.0:
+                blocked += 1
+            else:
+                served += 1
+                total_wait += wait
+                total_system += wait + service
+                total_busy += service
+        i += 1
+    totals[0] = t
+    totals[1] = start
+    totals[2] = total_wait
+    totals[3] = total_system
+    totals[4] = total_busy
+    totals[5] = total_service
+    totals[6] = arrived
+    totals[7] = served
+    totals[8] = blocked
+
+
+def _bucket_sums(arrivals, waits, services, bucket, horizon, arrived, served, blocked,
+                 wait_sum, in_system, busy, in_system_full, busy_full):
+    # Per time bucket of width bucket on [0, horizon): arrivals, served and
+    # blocked customers and their summed waits (by arrival bucket), and the
+    # customer-time (in_system) and server-time (busy) inside the bucket.
+    # Time past the horizon is not counted. A bucket an interval covers
+    # completely goes into a difference array (*_full), so every interval
+    # costs O(1) however many buckets it spans. Bucket indices use t /
+    # bucket, clamped to the last bucket, rather than t // bucket, which
+    # numba compiles to a much slower exact floor division.
+    n_buckets = len(arrived)
+    last_bucket = n_buckets - 1
+    for i in range(len(arrivals)):
+        arrival = arrivals[i]
+        b = int(arrival / bucket)
+        if b > last_bucket:
+            b = last_bucket
+        arrived[b] += 1
+        wait = waits[i]
+        if wait < 0.0:
+            blocked[b] += 1
+            continue
+        served[b] += 1
+        wait_sum[b] += wait
+        start = arrival + wait
+        departure = start + services[i]
+        if departure > horizon:
+            departure = horizon
+        last = int(departure / bucket)
+        # in system over [arrival, departure)
+        if arrival < departure:
+            first = b
+            if first >= last:
+                in_system[first] += departure - arrival
+            else:
+                in_system[first] += (first + 1) * bucket - arrival
+                if last <= last_bucket:
+                    in_system[last] += departure - last * bucket
+                    in_system_full[last] -= 1
+                else:
+                    in_system_full[n_buckets] -= 1
+                in_system_full[first + 1] += 1
+        # in service over [start, departure)
+        if start < departure:
+            first = int(start / bucket)
+            if first > last_bucket:
+                first = last_bucket
+            if first >= last:
+                busy[first] += departure - start
+            else:
+                busy[first] += (first + 1) * bucket - start
+                if last <= last_bucket:
+                    busy[last] += departure - last * bucket
+                    busy_full[last] -= 1
+                else:
+                    busy_full[n_buckets] -= 1
+                busy_full[first + 1] += 1
+
+
+def _time_change(gaps, starts, cumulative, rates, state, out):
+    # Map the points of a unit-rate Poisson process through the inverse of
+    # a piecewise-linear cumulative rate: piece j starts at time starts[j]
+    # and cumulative rate cumulative[j] and has rate rates[j] > 0. gaps are
+    # unit exponential gaps; state holds the last unit point and the
+    # current piece, carried over between blocks. Returns the number of
+    # arrival times written to out, stopping after the last piece.
+    s = state[0]
+    j = int(state[1])
+    n_pieces = len(rates)
+    count = 0
+    for i in range(len(gaps)):
+        s += gaps[i]
+        while j < n_pieces and s >= cumulative[j + 1]:
+            j += 1
+        if j == n_pieces:
+            break
+        out[count] = starts[j] + (s - cumulative[j]) / rates[j]
+        count += 1
+    state[0] = s
+    state[1] = j
+    return count
+
+
+def _exponentials(raw, rate, antithetic, out):
+    # Exponential variates from pairs of 32-bit Mersenne Twister outputs,
+    # built exactly as random.random() builds a uniform u from them. Returns
+    # False if some u is 0 (the Python path redraws those).
+    for i in range(len(out)):
+        a = raw[2 * i] >> 5
+        b = raw[2 * i + 1] >> 6
+        u = (a * 67108864.0 + b) * (1.0 / 9007199254740992.0)
+        if u == 0.0:
+            return False
+        if antithetic:
+            out[i] = -math.log(u) / rate
+        else:
+            out[i] = -math.log(1.0 - u) / rate
+    return True
+
+
+if HAVE_NUMBA:
+    _lindley_jit = numba.njit(_lindley)
+    _mmk_jit = numba.njit(_mmk)
+    _summarize_jit = numba.njit(_summarize)
+    _exponentials_jit = numba.njit(_exponentials)
+    _bucket_sums_jit = numba.njit(_bucket_sums)
+    _time_change_jit = numba.njit(_time_change)
+
+
+def resolve_backend(backend='auto'):
+    """Return 'numba' or 'python' for backend in ('auto', 'numba', 'python')."""
+    if backend == 'auto':
+        return 'numba' if HAVE_NUMBA else 'python'
+    if backend == 'numba' and not HAVE_NUMBA:
+        raise ImportError("numba backend requested but numba is not installed")
+    if backend not in ('numba', 'python'):
+        raise ValueError(f"Unknown backend: {backend}")
+    return backend
+
+
+def draw_exponentials(rng, rate, n, antithetic=False, backend='auto'):
+    """
+    Draw n exponential variates from a random.Random instance.
+
+    The values are those of n calls of -log(1 - u) / rate with
+    u = rng.random() (-log(u) / rate when antithetic), and rng is left where
+    those calls would leave it. With numba, numpy's MT19937 (the generator
+    random.Random uses) continues from rng's state and compiled code turns
+    its output into variates. The result is then a numpy array, otherwise
+    a list.
+    """
+    if resolve_backend(backend) == 'numba':
+        version, internal, gauss = rng.getstate()
+        generator = np.random.MT19937()
+        generator.state = {'bit_generator': 'MT19937',
+                           'state': {'key': np.array(internal[:-1], dtype=np.uint32),
+                                     'pos': internal[-1]}}
+        raw = generator.random_raw(2 * n).astype(np.int64)
+        out = np.empty(n, dtype=np.float64)
+        if _exponentials_jit(raw, rate, antithetic, out):
+            state = generator.state['state']
+            rng.setstate((version, tuple(state['key'].tolist()) + (int(state['pos']),), gauss))
+            return out
+        # some u was 0: rng is untouched, redraw the block below
+
+    rand = rng.random
+    us = [rand() for _ in range(n)]
+    while 0.0 in us:
+        us = [u or rand() for u in us]
+    log = math.log
+    if antithetic:
+        return [-log(u) / rate for u in us]
+    return [-log(1.0 - u) / rate for u in us]
+
+
+def _check(k, capacity):
+    if k < 1:
+        raise ValueError("Number of servers must be at least 1")
+    if capacity is not None and capacity < k:
+        raise ValueError("Capacity must be at least the number of servers")
+
+
+class _EventLoop:
+    # FCFS M/M/k/K whose state carries over from one chunk of customers to
+    # the next
+
+    def __init__(self, k, capacity, backend):
+        self.k = k
+        self.capacity = capacity or 0
+        self.lindley = k == 1 and capacity is None
+        self.compiled = backend == 'numba'
+        if self.compiled:
+            self.state = np.zeros(2)
+            self.server_free = np.zeros(k)
+            self.in_system = np.zeros(self.capacity)
+        else:
+            self.state = [0.0, 0.0]
+            self.server_free = [0.0] * k  # heap
+            self.departures = []          # heap
+
+    def run(self, interarrivals, services):
+        n = len(interarrivals)
+        if self.compiled:
+            interarrivals = np.asarray(interarrivals, dtype=np.float64)
+            services = np.asarray(services, dtype=np.float64)
+            waits = np.empty(n, dtype=np.float64)
+            if self.lindley:
+                _lindley_jit(interarrivals, services, waits, self.state)
+            else:
+                _mmk_jit(interarrivals, services, self.k, self.capacity, waits,
+                         self.server_free, self.in_system, self.state)
+            return waits
+
+        waits = array('d', bytes(8 * n))
+        if self.lindley:
+            _lindley(interarrivals, services, waits, self.state)
+        else:
+            _mmk_heap(interarrivals, services, self.capacity, waits,
+                      self.server_free, self.departures, self.state)
+        return waits
+
+
+def simulate_waits(interarrivals, services, k=1, capacity=None, backend='auto'):
+    """
+    Run the FCFS M/M/k/K event loop on pre-drawn random variates.
+
+    Args:
+        interarrivals (sequence): Time between customer i-1 and customer i
+        services (sequence): Service time of customer i
+        k (int): Number of servers
+        capacity (int): Maximum number in system (K), None for no limit
+        backend (str): 'auto', 'numba' or 'python'
+
+    Returns the waiting time in queue of every customer (-1.0 if blocked).
+    """
+    if len(services) != len(interarrivals):
+        raise ValueError("interarrivals and services must have the same length")
+    _check(k, capacity)
+    backend = resolve_backend(backend)
+    waits = _EventLoop(k, capacity, backend).run(interarrivals, services)
+    if backend == 'numba':
+        return array('d', waits.tobytes())
+    return waits
+
+
+def simulate_mmk(arrival_rng, service_rng, lambda_, mu, n, k=1, capacity=None, warmup=0,
+                 antithetic=False, backend='auto'):
+    """
+    Draw and simulate n customers of FCFS M/M/k/K and return the run totals.
+
+    Args:
+        arrival_rng, service_rng (random.Random): Generators for the
+            interarrival and service times (see draw_exponentials)
+        lambda_, mu (float): Arrival rate and service rate per server
+        n (int): Number of customers
+        k (int): Number of servers
+        capacity (int): Maximum number in system (K), None for no limit
+        warmup (int): Number of initial customers left out of the totals
+        antithetic (bool): Use 1 - u for every uniform u
+        backend (str): 'auto', 'numba' or 'python'
+
+    Returns a dict keyed by TOTALS: the clock at the last arrival ('end')
+    and at the first measured one ('start'); the summed waits, times in
+    system and service times of served customers ('wait', 'system',
+    'busy'); the summed service times of all measured customers
+    ('service'); and the numbers of measured customers that arrived, were
+    served and were blocked. With numba, drawing, the event loop and the
+    totals all run in compiled code a chunk at a time.
+    """
+    _check(k, capacity)
+    backend = resolve_backend(backend)
+    loop = _EventLoop(k, capacity, backend)
+    if backend == 'numba':
+        totals = np.zeros(len(TOTALS))
+        summarize = _summarize_jit
+    else:
+        totals = [0.0] * len(TOTALS)
+        summarize = _summarize
+    for first in range(0, n, CHUNK):
+        m = min(CHUNK, n - first)
+        interarrivals = draw_exponentials(arrival_rng, lambda_, m, antithetic, backend)
+        services = draw_exponentials(service_rng, mu, m, antithetic, backend)
+        waits = loop.run(interarrivals, services)
+        if backend == 'numba':
+            interarrivals = np.asarray(interarrivals, dtype=np.float64)
+            services = np.asarray(services, dtype=np.float64)
+        summarize(interarrivals, services, waits, warmup - first, totals)
+    return {name: float(value) for name, value in zip(TOTALS, totals)}
+
+
+def piecewise_arrivals(draw_gaps, starts, rates, ends, max_block=65536, backend='auto'):
+    """
+    Arrival times of a Poisson process with a piecewise-constant rate.
+
+    Args:
+        draw_gaps (callable): draw_gaps(n, backend) returns n unit
+            exponential variates, e.g. a partial draw_exponentials
+        starts, rates, ends (sequences): Start, rate (> 0) and end of each
+            piece, in time order and not overlapping
+        max_block (int): Most variates drawn at once
+        backend (str): 'auto', 'numba' or 'python'
+
+    Points of a unit-rate process on [0, Λ(end)), where Λ is the
+    cumulative rate, are mapped back through Λ's inverse, which is linear
+    within each piece. This is exact and costs O(1) per piece, whatever its
+    rate. Returns an array('d') of arrival times.
+    """
+    compiled = resolve_backend(backend) == 'numba'
+    cumulative = [0.0]
+    for start, lam, end in zip(starts, rates, ends):
+        cumulative.append(cumulative[-1] + lam * (end - start))
+    total = cumulative[-1]
+    if compiled:
+        starts = np.asarray(starts, dtype=np.float64)
+        rates = np.asarray(rates, dtype=np.float64)
+        cumulative = np.asarray(cumulative, dtype=np.float64)
+        state = np.zeros(2)
+        kernel = _time_change_jit
+    else:
+        state = [0.0, 0.0]
+        kernel = _time_change
+
+    arrivals = array('d')
+    while state[1] < len(rates):
+        expected = total - state[0]
+        block = min(int(expected + 3.0 * math.sqrt(expected)) + 4, max_block)
+        gaps = draw_gaps(block, backend)
+        if compiled:
+            gaps = np.asarray(gaps, dtype=np.float64)
+            out = np.empty(block, dtype=np.float64)
+            count = kernel(gaps, starts, cumulative, rates, state, out)
+            arrivals.frombytes(out[:count].tobytes())
+        else:
+            out = [0.0] * block
+            count = kernel(gaps, starts, cumulative, rates, state, out)
+            arrivals.extend(out[:count])
+    return arrivals
+
+
+def interarrival_times(arrivals, backend='auto'):
+    """
+    Gaps between successive arrival times, the first measured from 0, as
+    an array simulate_waits takes.
+    """
+    if resolve_backend(backend) == 'numba':
+        return np.diff(np.asarray(arrivals, dtype=np.float64), prepend=0.0)
+    return array('d', map(sub, arrivals, chain((0.0,), arrivals)))
+
+
+def bucket_sums(arrivals, waits, services, bucket, horizon, backend='auto'):
+    """
+    Sum a time-varying run into buckets of width bucket on [0, horizon).
+
+    Args:
+        arrivals (sequence): Arrival time of every customer, below horizon
+        waits (sequence): Their waits from simulate_waits (-1.0 if blocked)
+        services (sequence): Their service times
+        bucket (float): Bucket width
+        horizon (float): End of the run; time past it is not counted
+        backend (str): 'auto', 'numba' or 'python'
+
+    Returns a dict of lists, one value per bucket: 'arrived', 'served' and
+    'blocked' customers and 'wait' (their summed waits) by arrival bucket,
+    and the customer-time 'in_system' and server-time 'busy' inside each
+    bucket.
+    """
+    compiled = resolve_backend(backend) == 'numba'
+
+    def zeros(n):
+        return np.zeros(n) if compiled else [0.0] * n
+
+    n_buckets = math.ceil(horizon / bucket)
+    if compiled:
+        arrivals = np.asarray(arrivals, dtype=np.float64)
+        waits = np.asarray(waits, dtype=np.float64)
+        services = np.asarray(services, dtype=np.float64)
+        kernel = _bucket_sums_jit
+    else:
+        kernel = _bucket_sums
+    sums = {name: zeros(n_buckets) for name in ('arrived', 'served', 'blocked', 'wait',
+                                                'in_system', 'busy')}
+    in_system_full = zeros(n_buckets + 1)
+    busy_full = zeros(n_buckets + 1)
+    kernel(arrivals, waits, services, bucket, horizon, sums['arrived'], sums['served'],
+           sums['blocked'], sums['wait'], sums['in_system'], sums['busy'],
+           in_system_full, busy_full)
+
+    result = {name: [float(x) for x in column] for name, column in sums.items()}
+    for name, full in (('in_system', in_system_full), ('busy', busy_full)):
+        covering = 0.0
+        column = result[name]
+        for b in range(n_buckets):
+            covering += full[b]
+            column[b] += covering * bucket
+    return result
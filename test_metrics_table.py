@@ -0,0 +1,83 @@
+import io
+import json
+import math
+
+import pytest
+
+from conftest import import_oop
+from metrics_table import COLUMNS, MetricsTable
+from queues import mm1, mm1k, mm1m, mminf, mmk, tabulate
+
+MM1 = import_oop('mm1').MM1
+MM1K = import_oop('mm1k').MM1K
+MM1m = import_oop('mm1m').MM1m
+MMk = import_oop('mmk').MMk
+MMInf = import_oop('mminf').MMInf
+
+# (function, its arguments, the same model as an OOP object)
+MODELS = [
+    (mm1, (5, 8), lambda: MM1(5, 8)),
+    (mmk, (5, 8, 2), lambda: MMk(5, 8, 2)),
+    (mmk, (20, 8, 4), lambda: MMk(20, 8, 4)),
+    (mm1k, (5, 8, 6), lambda: MM1K(5, 8, 6)),
+    # MM1m takes the rate per source but its formulas use λ·m as that rate
+    (mm1m, (3, 8, 6), lambda: MM1m(0.5, 8, 6)),
+    (mminf, (5, 8, 4), lambda: MMInf(5, 8)),
+]
+
+
+def same(x, y):
+    if math.isnan(x) or math.isnan(y):
+        return math.isnan(x) and math.isnan(y)
+    return math.isclose(x, y, rel_tol=1e-9, abs_tol=1e-12)
+
+
+@pytest.mark.parametrize("function, args, make_model", MODELS)
+def test_both_paths_fill_the_same_columns(function, args, make_model):
+    table = tabulate(function, [args])
+    table.append_model(make_model())
+    functional, oop = table.row(0), table.row(1)
+    mismatched = [name for name in COLUMNS if not same(functional[name], oop[name])]
+    assert mismatched == []
+
+
+def test_tabulate_leaves_the_functions_output_alone():
+    assert mminf(5, 8, 4)['Pw'] == 1 - math.exp(-5 / 8)
+    assert 'λ_eff' not in mm1k(5, 8, 6)
+
+
+def test_npy_round_trip(tmp_path):
+    table = tabulate(mmk, [(5, 8, k) for k in range(1, 10)])
+    table.save_npy(str(tmp_path))
+    loaded = MetricsTable.load_npy(str(tmp_path))
+    assert len(loaded) == len(table)
+    for name in COLUMNS:
+        assert all(same(x, y) for x, y in zip(loaded.column(name), table.column(name)))
+
+
+def test_npy_files_load_with_numpy(tmp_path):
+    np = pytest.importorskip("numpy")
+    table = tabulate(mm1k, [(5, 8, K) for K in range(4, 9)])
+    table.save_npy(str(tmp_path))
+    column = np.load(str(tmp_path / 'L.npy'), mmap_mode='r')
+    assert list(column) == list(table.column('L'))
+
+
+def test_column_is_a_view_of_the_table():
+    table = tabulate(mm1, [(5, 8)])
+    table.column('L')[0] = 42.0
+    assert table.row(0)['L'] == 42.0
+
+
+def test_jsonl_writes_nan_as_null():
+    table = tabulate(mm1, [(5, 8)])
+    out = io.StringIO()
+    table.write_jsonl(out)
+    record = json.loads(out.getvalue())
+    assert record['servers'] is None
+    assert record['L'] == mm1(5, 8)['L']
+
+
+def test_unknown_column_is_rejected():
+    with pytest.raises(ValueError):
+        MetricsTable().append(queue_length=1.0)
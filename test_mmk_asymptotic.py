@@ -0,0 +1,64 @@
+import math
+
+import pytest
+
+from conftest import import_oop
+from queues import mmk
+
+mmk_module = import_oop('mmk')
+MMk = mmk_module.MMk
+
+BOUND = 0.033  # relative error of 'normal' below BOUND / sqrt(k)
+
+
+def relative_error(a, k, method):
+    approx = MMk(a, 1.0, k, method)._log_erlang_c()
+    exact = MMk(a, 1.0, k, 'exact')._log_erlang_c()
+    return abs(math.expm1(approx - exact))
+
+
+def load_for_beta(k, beta):
+    # a with k = a + beta * sqrt(a)
+    root = (math.sqrt(beta * beta + 4 * k) - beta) / 2
+    return root * root
+
+
+@pytest.mark.parametrize("k", [100, 1000, 10_000, 100_000])
+def test_normal_error_bound_over_beta(k):
+    errors = [relative_error(load_for_beta(k, i / 100), k, 'normal') for i in range(1, 401)]
+    assert max(errors) < BOUND / math.sqrt(k)
+    # the grid reaches the worst case, so the bound is close to tight
+    assert max(errors) > 0.9 * BOUND / math.sqrt(k)
+
+
+@pytest.mark.parametrize("k", [1000, 10_000])
+def test_normal_error_bound_over_rho(k):
+    for i in range(1, 100):
+        assert relative_error(k * i / 100, k, 'normal') < BOUND / math.sqrt(k)
+
+
+def test_auto_switches_at_the_threshold():
+    k = mmk_module.ASYMPTOTIC_MIN_SERVERS
+    assert MMk(0.9 * (k - 1), 1.0, k - 1).method == 'exact'
+    assert MMk(0.9 * k, 1.0, k).method == 'normal'
+
+
+@pytest.mark.parametrize("k", [1, 2, 5, 20])
+def test_exact_matches_closed_form(k):
+    model = MMk(0.8 * k * 3.0, 3.0, k, 'exact')
+    expected = mmk(0.8 * k * 3.0, 3.0, k)
+    assert model.probability_all_servers_busy() == pytest.approx(expected['Pw'], rel=1e-10)
+    assert model.average_time_in_queue() == pytest.approx(expected['Wq'], rel=1e-10)
+
+
+def test_halfin_whitt_is_accurate_only_near_rho_one():
+    k = 10_000
+    assert relative_error(load_for_beta(k, 0.1), k, 'halfin-whitt') < 0.01
+    assert relative_error(0.8 * k, k, 'halfin-whitt') > 0.5
+
+
+def test_tail_probability():
+    model = MMk(9.0, 1.0, 10)
+    assert model.probability_wait_exceeds(0.0) == pytest.approx(model.probability_all_servers_busy())
+    assert model.probability_wait_exceeds(2.0) == pytest.approx(
+        model.probability_all_servers_busy() * math.exp(-2.0))
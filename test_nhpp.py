@@ -0,0 +1,130 @@
+import math
+
+import pytest
+
+from bonus_mm1 import Streams, nhpp_arrivals, nhpp_simulation
+from sim_kernel import draw_exponentials, interarrival_times, simulate_waits
+
+TABLE = [(0.0, 3.0), (0.5, 0.0), (1.25, 40.0), (1.5, 8.0), (4.0, 15.0), (6.5, 12.0)]
+HORIZON = 8.0
+
+
+def table_integral(table, horizon):
+    total = 0.0
+    for i, (start, lam) in enumerate(table):
+        end = min(table[i + 1][0] if i + 1 < len(table) else horizon, horizon)
+        total += lam * max(end - start, 0.0)
+    return total
+
+
+def rate_fn(t):
+    return 10.0 + 8.0 * math.sin(t)
+
+
+@pytest.mark.parametrize("antithetic", [False, True])
+def test_block_draws_match_single_draws(antithetic):
+    streams, single = Streams(5, antithetic), Streams(5, antithetic)
+    assert streams.interarrivals(3.0, 500) == [single.interarrival(3.0) for _ in range(500)]
+    assert streams.acceptances(500) == [single.acceptance() for _ in range(500)]
+
+
+@pytest.mark.parametrize("rate, rate_max, expected", [
+    (TABLE, None, table_integral(TABLE, HORIZON)),
+    (rate_fn, 18.0, 10.0 * HORIZON + 8.0 * (1.0 - math.cos(HORIZON))),
+])
+def test_counts_match_the_integrated_rate(rate, rate_max, expected):
+    counts = [len(nhpp_arrivals(rate, HORIZON, Streams(seed), rate_max, backend='python'))
+              for seed in range(400)]
+    mean = sum(counts) / len(counts)
+    variance = sum((c - mean) ** 2 for c in counts) / (len(counts) - 1)
+    # Poisson: mean and variance both equal the integrated rate
+    assert abs(mean - expected) < 4 * math.sqrt(expected / len(counts))
+    assert variance == pytest.approx(expected, rel=0.25)
+
+
+def test_table_follows_the_pieces():
+    counts = [0] * len(TABLE)
+    starts = [start for start, _ in TABLE]
+    for seed in range(200):
+        for t in nhpp_arrivals(TABLE, HORIZON, Streams(seed), backend='python'):
+            counts[sum(start <= t for start in starts) - 1] += 1
+    for i, (start, lam) in enumerate(TABLE):
+        end = TABLE[i + 1][0] if i + 1 < len(TABLE) else HORIZON
+        expected = 200 * lam * (end - start)
+        assert abs(counts[i] - expected) <= 4 * math.sqrt(expected) + 1e-9
+
+
+@pytest.mark.parametrize("rate, rate_max", [(TABLE, None), (rate_fn, 18.0)])
+def test_arrivals_are_sorted_and_inside_the_horizon(rate, rate_max):
+    arrivals = nhpp_arrivals(rate, HORIZON, Streams(1), rate_max, backend='python')
+    assert all(a < b for a, b in zip(arrivals, arrivals[1:]))
+    assert 0.0 <= arrivals[0] and arrivals[-1] < HORIZON
+
+
+def test_block_size_does_not_change_the_run():
+    for rate, rate_max in ((TABLE, None), (rate_fn, 18.0)):
+        expected = nhpp_arrivals(rate, HORIZON, Streams(2), rate_max, backend='python')
+        assert nhpp_arrivals(rate, HORIZON, Streams(2), rate_max, max_block=7,
+                             backend='python') == expected
+
+
+def test_rate_above_rate_max_raises():
+    with pytest.raises(ValueError):
+        nhpp_arrivals(rate_fn, HORIZON, Streams(0), rate_max=12.0)
+    with pytest.raises(ValueError):
+        nhpp_arrivals(rate_fn, HORIZON, Streams(0))
+
+
+def overlap(t0, t1, lo, hi):
+    return max(0.0, min(t1, hi) - max(t0, lo))
+
+
+@pytest.mark.parametrize("horizon, bucket", [(8.0, 1.0), (8.37, 1.0), (7.9, 0.7)])
+@pytest.mark.parametrize("capacity", [None, 4])
+def test_buckets_match_brute_force(horizon, bucket, capacity):
+    # replays the run customer by customer and sums every bucket directly
+    k, mu = 2, 5.0
+    result = nhpp_simulation(TABLE, mu, k, horizon, bucket, Streams(0), capacity, backend='python')
+    streams = Streams(0)
+    arrivals = nhpp_arrivals(TABLE, horizon, streams, backend='python')
+    services = draw_exponentials(streams.services, mu, len(arrivals), False, 'python')
+    waits = simulate_waits(interarrival_times(arrivals, 'python'), services, k, capacity, 'python')
+
+    # someone is still in the system at the horizon, so clipping matters
+    assert any(w >= 0 and a + w + s > horizon for a, w, s in zip(arrivals, waits, services))
+    n_buckets = math.ceil(horizon / bucket)
+    assert len(result['t']) == n_buckets
+    for b in range(n_buckets):
+        lo, hi = b * bucket, min((b + 1) * bucket, horizon)
+        inside = [i for i, a in enumerate(arrivals) if lo <= a < hi]
+        served = [i for i in inside if waits[i] >= 0]
+        in_system = busy = 0.0
+        for a, w, s in zip(arrivals, waits, services):
+            if w >= 0:
+                in_system += overlap(a, a + w + s, lo, hi)
+                busy += overlap(a + w, a + w + s, lo, hi)
+        assert result['λ'][b] == pytest.approx(len(inside) / (hi - lo))
+        assert result['L'][b] == pytest.approx(in_system / (hi - lo), abs=1e-9)
+        assert result['ρ'][b] == pytest.approx(busy / (k * (hi - lo)), abs=1e-9)
+        assert result['ρ'][b] <= 1.0 + 1e-9
+        if served:
+            assert result['Wq'][b] == pytest.approx(sum(waits[i] for i in served) / len(served))
+        if inside:
+            assert result['P_block'][b] == (len(inside) - len(served)) / len(inside)
+
+
+def test_numba_matches_python():
+    pytest.importorskip("numba")
+    assert (nhpp_arrivals(TABLE, HORIZON, Streams(3), backend='numba')
+            == nhpp_arrivals(TABLE, HORIZON, Streams(3), backend='python'))
+    for rate, rate_max, capacity in ((TABLE, None, None), (rate_fn, 18.0, 4)):
+        for antithetic in (False, True):
+            python = nhpp_simulation(rate, 5.0, 3, 8.37, 0.5, Streams(3, antithetic), capacity,
+                                     rate_max, backend='python')
+            numba = nhpp_simulation(rate, 5.0, 3, 8.37, 0.5, Streams(3, antithetic), capacity,
+                                    rate_max, backend='numba')
+            # NaN != NaN, so compare the bytes of every column
+            assert {name: bytes(column) if name != 'num_customers' else column
+                    for name, column in python.items()} == \
+                   {name: bytes(column) if name != 'num_customers' else column
+                    for name, column in numba.items()}
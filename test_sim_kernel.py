@@ -0,0 +1,84 @@
+import random
+from array import array
+
+import pytest
+
+import sim_kernel
+from bonus_mm1 import Streams, mmk_simulation
+from sim_kernel import _mmk, _mmk_heap, draw_exponentials, simulate_waits
+
+CONFIGS = [(1, None), (1, 3), (3, None), (3, 6), (10, None), (10, 20)]
+
+
+def draw(lambda_, mu, n, seed):
+    streams = Streams(seed)
+    interarrivals = array('d', (streams.interarrival(lambda_) for _ in range(n)))
+    services = array('d', (streams.service(mu) for _ in range(n)))
+    return interarrivals, services
+
+
+@pytest.mark.parametrize("k, capacity", CONFIGS)
+def test_scan_kernel_matches_heap_reference(k, capacity):
+    # the kernel numba compiles, run as plain Python, against the reference
+    interarrivals, services = draw(0.9 * k, 1.0, 5000, seed=k)
+    expected = array('d', bytes(8 * len(interarrivals)))
+    _mmk_heap(interarrivals, services, capacity or 0, expected, [0.0] * k, [], [0.0])
+    waits = array('d', bytes(8 * len(interarrivals)))
+    _mmk(interarrivals, services, k, capacity or 0, waits,
+         [0.0] * k, [0.0] * (capacity or 0), [0.0, 0.0])
+    assert waits == expected
+
+
+@pytest.mark.parametrize("k, capacity", CONFIGS)
+def test_mmk_simulation_matches_kernel(k, capacity):
+    # mmk_simulation's draws and totals agree with one-at-a-time draws
+    # pushed through simulate_waits
+    interarrivals, services = draw(0.9 * k, 1.0, 5000, seed=k)
+    waits = simulate_waits(interarrivals, services, k, capacity, 'python')
+    served = [w for w in waits if w >= 0]
+    total_wait = 0.0
+    for w in served:
+        total_wait += w
+    result = mmk_simulation(0.9 * k, 1.0, k, 5000, Streams(k), capacity, backend='python')
+    assert result['Wq'] == total_wait / len(served)
+    assert result['P_block'] == (len(waits) - len(served)) / len(waits)
+
+
+@pytest.mark.parametrize("k, capacity", CONFIGS)
+def test_chunks_do_not_change_the_run(k, capacity, monkeypatch):
+    expected = mmk_simulation(0.9 * k, 1.0, k, 5000, Streams(k), capacity, 300, backend='python')
+    monkeypatch.setattr(sim_kernel, 'CHUNK', 777)
+    assert mmk_simulation(0.9 * k, 1.0, k, 5000, Streams(k), capacity, 300,
+                          backend='python') == expected
+
+
+@pytest.mark.parametrize("antithetic", [False, True])
+def test_block_draws_match_single_draws(antithetic):
+    streams = Streams(3, antithetic)
+    expected = [streams.interarrival(2.0) for _ in range(1000)]
+    rng = random.Random("3-arrivals")
+    assert draw_exponentials(rng, 2.0, 1000, antithetic, 'python') == expected
+    assert rng.getstate() == streams.arrivals.getstate()
+
+
+@pytest.mark.parametrize("antithetic", [False, True])
+def test_numba_draws_match_python(antithetic):
+    pytest.importorskip("numba")
+    rng_python, rng_numba = random.Random(7), random.Random(7)
+    expected = draw_exponentials(rng_python, 2.0, 1000, antithetic, 'python')
+    assert list(draw_exponentials(rng_numba, 2.0, 1000, antithetic, 'numba')) == expected
+    assert rng_numba.getstate() == rng_python.getstate()
+
+
+@pytest.mark.parametrize("k, capacity", CONFIGS)
+def test_numba_matches_python(k, capacity, monkeypatch):
+    pytest.importorskip("numba")
+    interarrivals, services = draw(0.9 * k, 1.0, 5000, seed=k)
+    assert (simulate_waits(interarrivals, services, k, capacity, 'numba')
+            == simulate_waits(interarrivals, services, k, capacity, 'python'))
+    monkeypatch.setattr(sim_kernel, 'CHUNK', 777)
+    for antithetic in (False, True):
+        assert (mmk_simulation(0.9 * k, 1.0, k, 5000, Streams(k, antithetic), capacity, 300,
+                               backend='numba')
+                == mmk_simulation(0.9 * k, 1.0, k, 5000, Streams(k, antithetic), capacity, 300,
+                                  backend='python'))
@@ -0,0 +1,58 @@
+import math
+import random
+
+import pytest
+
+from conftest import import_oop
+
+MMk = import_oop('mmk').MMk
+staffing = import_oop('staffing')
+
+SLAS = [
+    (dict(max_pw=0.2), lambda model: model.probability_all_servers_busy() <= 0.2),
+    (dict(max_wq=0.01), lambda model: model.average_time_in_queue() <= 0.01),
+    (dict(service_level=(0.02, 0.9)), lambda model: model.probability_wait_exceeds(0.02) <= 0.1),
+]
+
+
+def brute_force(lam, mu, meets_sla):
+    k = math.floor(lam / mu) + 1
+    while not meets_sla(MMk(lam, mu, k)):
+        k += 1
+    return k
+
+
+@pytest.mark.parametrize("sla, meets_sla", SLAS)
+@pytest.mark.parametrize("low, high", [(0.5, 50), (50, 900), (900, 5000)])
+def test_matches_brute_force_search(sla, meets_sla, low, high):
+    # MMk uses the same exact/normal switch, so the answers agree exactly
+    rng = random.Random(f"{low}-{high}")
+    lambdas = [rng.uniform(low, high) for _ in range(60)]
+    plan = staffing.plan_staffing(lambdas, 1.0, **sla)
+    assert list(plan['k']) == [brute_force(lam, 1.0, meets_sla) for lam in lambdas]
+
+
+def test_metrics_match_mmk():
+    plan = staffing.plan_staffing([30, 300, 3000], 2.0, max_pw=0.3)
+    for lam, k, wq, pw in zip([30, 300, 3000], plan['k'], plan['Wq'], plan['Pw']):
+        model = MMk(lam, 2.0, k)
+        # from 1000 servers on, B is stepped from an approximate start
+        rel = 1e-9 if k < staffing.ASYMPTOTIC_MIN_SERVERS else 0.033 / math.sqrt(k)
+        assert pw == pytest.approx(model.probability_all_servers_busy(), rel=rel)
+        assert wq == pytest.approx(model.average_time_in_queue(), rel=rel)
+
+
+def test_zero_load_floor_and_costs():
+    plan = staffing.plan_staffing([0, 4, 4, 40], [1.0, 2.0, 2.0, 2.0], max_pw=0.5,
+                                  server_cost=3.0, min_servers=5)
+    assert plan['k'][0] == 5 and plan['Pw'][0] == 0.0
+    assert plan['k'][1] == plan['k'][2] == 5
+    assert plan['Pw'][1] == pytest.approx(MMk(4, 2.0, 5).probability_all_servers_busy())
+    assert plan['k'][3] == brute_force(40, 2.0, lambda m: m.probability_all_servers_busy() <= 0.5)
+    assert list(plan['cost']) == [3.0 * k for k in plan['k']]
+    assert plan['total_cost'] == sum(plan['cost'])
+
+
+def test_needs_an_sla():
+    with pytest.raises(ValueError):
+        staffing.plan_staffing([1.0], 1.0)
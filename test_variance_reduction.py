@@ -0,0 +1,57 @@
+import math
+
+import pytest
+
+from bonus_mm1 import Streams, mmk_simulation
+from variance_reduction import (antithetic, control_variate, difference, efficiency, plain,
+                                wq_estimator, wq_with_control)
+
+
+def test_streams_with_the_same_seed_repeat():
+    a, b = Streams(3), Streams(3)
+    assert [a.interarrival(2.0) for _ in range(100)] == [b.interarrival(2.0) for _ in range(100)]
+    assert [a.service(5.0) for _ in range(100)] == [b.service(5.0) for _ in range(100)]
+
+
+def test_services_do_not_depend_on_arrival_draws():
+    a, b = Streams(3), Streams(3)
+    for _ in range(50):
+        a.interarrival(2.0)
+    assert [a.service(5.0) for _ in range(100)] == [b.service(5.0) for _ in range(100)]
+
+
+def test_antithetic_streams_use_one_minus_u():
+    plain_streams, anti = Streams(3), Streams(3, antithetic=True)
+    for _ in range(100):
+        x, y = plain_streams.interarrival(2.0), anti.interarrival(2.0)
+        # x = -log(1 - u) / rate and y = -log(u) / rate
+        assert math.exp(-2.0 * x) + math.exp(-2.0 * y) == pytest.approx(1.0)
+        assert plain_streams.acceptance() + anti.acceptance() == pytest.approx(1.0)
+
+
+def test_runs_sharing_a_seed_see_the_same_customers():
+    # same customers whatever k, so the controls agree exactly
+    results = [mmk_simulation(9.0, 1.0, k, 3000, Streams(5), warmup=300) for k in (10, 11, 12)]
+    assert len({r['mean_service'] for r in results}) == 1
+    assert len({r['mean_interarrival'] for r in results}) == 1
+
+
+def test_control_has_the_known_mean():
+    estimate = wq_with_control(24, 10, 3, 500, capacity=6, warmup=50)
+    xs = [estimate(Streams(i))[1] for i in range(300)]
+    mean = sum(xs) / len(xs)
+    std_error = math.sqrt(sum((x - mean) ** 2 for x in xs) / (len(xs) - 1) / len(xs))
+    assert abs(mean) < 4 * std_error
+
+
+def test_estimators_reduce_variance():
+    wq = wq_estimator(24, 10, 3, 500, capacity=6, warmup=50)
+    baseline = plain(wq, 100)
+    cv = control_variate(wq_with_control(24, 10, 3, 500, capacity=6, warmup=50), 0.0, 100)
+    assert efficiency(cv, baseline)['variance_reduction'] > 1.5
+    assert efficiency(antithetic(wq, 100), baseline)['variance_reduction'] > 1.0
+
+    wq10 = wq_estimator(95, 10, 10, 500, warmup=50)
+    wq11 = wq_estimator(95, 10, 11, 500, warmup=50)
+    crn, independent = difference(wq10, wq11, 100), difference(wq10, wq11, 100, crn=False)
+    assert efficiency(crn, independent)['variance_reduction'] > 1.0
@@ -0,0 +1,154 @@
+import time
+
+from bonus_mm1 import Streams, mmk_simulation
+from queues import mm1
+
+# Each estimator takes a function streams -> float (one simulation run) and
+# returns {'mean', 'variance', 'cpu', 'n'} where variance is the variance of
+# the mean and cpu is the CPU time in seconds.
+
+
+def _mean_var(values):
+    n = len(values)
+    mean = sum(values) / n
+    var = sum((v - mean) ** 2 for v in values) / (n - 1)
+    return mean, var
+
+
+def _result(values, cpu):
+    mean, var = _mean_var(values)
+    return {'mean': mean, 'variance': var / len(values), 'cpu': cpu, 'n': len(values)}
+
+
+def plain(estimate, n, seed=0):
+    """Independent replications, the baseline for all other estimators."""
+    start = time.process_time()
+    values = [estimate(Streams(seed + i)) for i in range(n)]
+    return _result(values, time.process_time() - start)
+
+
+def antithetic(estimate, n, seed=0):
+    """
+    Antithetic replications: n // 2 pairs, each run paired with the run that
+    uses 1 - u for every uniform u.
+    """
+    start = time.process_time()
+    values = []
+    for i in range(n // 2):
+        y1 = estimate(Streams(seed + i))
+        y2 = estimate(Streams(seed + i, antithetic=True))
+        values.append((y1 + y2) / 2)
+    result = _result(values, time.process_time() - start)
+    result['n'] = 2 * len(values)
+    return result
+
+
+def difference(estimate_a, estimate_b, n, seed=0, crn=True):
+    """
+    Estimate E[b] - E[a] for two configurations, e.g. k=10 against k=11.
+
+    With crn=True both configurations see the same arrival and service
+    streams in every replication; with crn=False they are independent.
+    """
+    start = time.process_time()
+    values = []
+    for i in range(n):
+        seed_b = seed + i if crn else seed + n + i
+        values.append(estimate_b(Streams(seed_b)) - estimate_a(Streams(seed + i)))
+    return _result(values, time.process_time() - start)
+
+
+def control_variate(estimate, control_mean, n, seed=0):
+    """
+    Control-variate estimator.
+
+    estimate returns a pair (y, x) from one run: the quantity of interest
+    and a control with known mean control_mean, so the control costs no
+    extra simulation. The coefficient is fitted from the same replications.
+    """
+    start = time.process_time()
+    ys = []
+    xs = []
+    for i in range(n):
+        y, x = estimate(Streams(seed + i))
+        ys.append(y)
+        xs.append(x)
+    y_mean, y_var = _mean_var(ys)
+    x_mean, x_var = _mean_var(xs)
+    cov = sum((y - y_mean) * (x - x_mean) for y, x in zip(ys, xs)) / (n - 1)
+    c = cov / x_var if x_var > 0 else 0.0
+    adjusted = [y - c * (x - control_mean) for y, x in zip(ys, xs)]
+    result = _result(adjusted, time.process_time() - start)
+    result['coefficient'] = c
+    result['variance_y'] = y_var / n
+    return result
+
+
+def efficiency(result, baseline):
+    """
+    Compare an estimator against plain replication.
+
+    variance_reduction is the ratio of the variances of the mean at the
+    replication counts used. cpu_savings is how many times more CPU time
+    plain replication needs to reach the same precision.
+    """
+    factor = (baseline['variance'] * baseline['n']) / (result['variance'] * result['n'])
+    cost_ratio = (result['cpu'] / result['n']) / (baseline['cpu'] / baseline['n'])
+    return {'variance_reduction': factor, 'cpu_savings': factor / cost_ratio}
+
+
+def wq_estimator(lambda_, mu, k, num_customers, capacity=None, warmup=0):
+    """Return a function streams -> simulated Wq for an M/M/k(/K) system."""
+    def estimate(streams):
+        return mmk_simulation(lambda_, mu, k, num_customers, streams, capacity, warmup)['Wq']
+    return estimate
+
+
+def wq_with_control(lambda_, mu, k, num_customers, capacity=None, warmup=0):
+    """
+    Return a function streams -> (Wq, x) for control_variate(..., 0.0, n).
+
+    x = mu * mean service time - lambda_ * mean interarrival time of the
+    measured customers has mean exactly 0. Both terms come from the same run
+    as Wq: more work than usual or arrivals closer together push Wq up.
+    """
+    def estimate(streams):
+        result = mmk_simulation(lambda_, mu, k, num_customers, streams, capacity, warmup)
+        return result['Wq'], mu * result['mean_service'] - lambda_ * result['mean_interarrival']
+    return estimate
+
+
+def print_report(name, result, baseline):
+    eff = efficiency(result, baseline)
+    print(f"{name}:")
+    print(f"  estimate = {result['mean']:.5f} (plain {baseline['mean']:.5f})")
+    print(f"  std error = {result['variance'] ** 0.5:.5f} (plain {baseline['variance'] ** 0.5:.5f})")
+    print(f"  variance reduction = {eff['variance_reduction']:.2f}x, "
+          f"CPU savings = {eff['cpu_savings']:.2f}x")
+
+
+def main():
+    n = 200
+    customers = 2000
+    warmup = 200
+
+    # Common random numbers: Wq(k=11) - Wq(k=10)
+    wq10 = wq_estimator(95, 10, 10, customers, warmup=warmup)
+    wq11 = wq_estimator(95, 10, 11, customers, warmup=warmup)
+    print_report("CRN, Wq(k=11) - Wq(k=10)",
+                 difference(wq10, wq11, n), difference(wq10, wq11, n, crn=False))
+
+    # Antithetic replications for M/M/1
+    wq = wq_estimator(5, 7.5, 1, customers, warmup=warmup)
+    print_report(f"Antithetic, M/M/1 Wq (exact {mm1(5, 7.5)['Wq']:.5f})",
+                 antithetic(wq, n), plain(wq, n))
+
+    # Control variate: the run's own mean service and interarrival times
+    with_control = wq_with_control(24, 10, 3, customers, capacity=6, warmup=warmup)
+    print_report("Control variate, M/M/3/6 Wq using its service and interarrival means",
+                 control_variate(with_control, 0.0, n),
+                 plain(wq_estimator(24, 10, 3, customers, capacity=6, warmup=warmup), n))
+
+
+if __name__ == "__main__":
+    main()